@@ -0,0 +1,138 @@
+import re
+import json
+import time
+import hashlib
+import threading
+import diskcache
+import numpy as np
+import google.generativeai as genai
+from pybloom_live import ScalableBloomFilter
+
+# --- Configuration ---
+CACHE_DIRECTORY = ".llm_cache"
+EMBEDDING_MODEL = "models/text-embedding-004"
+SIMILARITY_THRESHOLD = 0.92
+ENTRY_TTL_SECONDS = 7 * 24 * 3600
+
+
+class LLMCache:
+    """
+    Persistent cache for Gemini responses, backed by diskcache so entries survive
+    Streamlit reruns and restarts. Offers two kinds of lookup:
+    - exact: SHA-256 key over the call's inputs, for near-deterministic calls (intent, hints).
+    - semantic: cosine similarity between text embeddings within a namespace
+      (e.g. one question), for replies that only need to be close, not identical. A bloom
+      filter over word shingles of the stored texts skips the embedding call for texts
+      that share no shingle with any of them.
+    Every entry expires after `ttl` seconds.
+    """
+    def __init__(self, directory=CACHE_DIRECTORY, threshold=SIMILARITY_THRESHOLD, ttl=ENTRY_TTL_SECONDS):
+        self._store = diskcache.Cache(directory)
+        self.threshold = threshold
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # namespace -> (unit-normalized embedding matrix, cached values, expiry times), loaded lazily from disk.
+        self._indexes = {}
+        # namespace -> ScalableBloomFilter of shingles of the stored texts, also loaded lazily.
+        self._blooms = {}
+
+    @staticmethod
+    def make_key(*parts):
+        """Deterministic key over JSON-serializable parts."""
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def get(self, key):
+        return self._store.get(("exact", key))
+
+    def set(self, key, value):
+        self._store.set(("exact", key), value, expire=self.ttl)
+
+    def embed(self, text):
+        """Returns the unit-normalized embedding of `text`, or None if the embedding call fails."""
+        try:
+            result = genai.embed_content(model=EMBEDDING_MODEL, content=text, task_type="SEMANTIC_SIMILARITY")
+        except Exception as e:
+            print(f"--- Embedding Error: {e} ---")
+            return None
+        embedding = np.asarray(result["embedding"], dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+
+    @staticmethod
+    def shingles(text):
+        """Word 3-grams of the normalized text (the whole text if it is shorter)."""
+        words = re.findall(r"\w+", text.lower())
+        return {" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+
+    def lookup(self, namespace, text):
+        """
+        Returns `(value, embedding)`: the value cached for the most similar text in
+        `namespace` (None below the threshold) and the embedding to pass to `store`.
+        The embedding is None when the text shares no shingle with the stored texts
+        and was not embedded.
+        """
+        if not self._might_contain(namespace, text):
+            return None, None
+        embedding = self.embed(text)
+        if embedding is None:
+            return None, None
+        with self._lock:
+            matrix, values, expires = self._index(namespace)
+            if not values:
+                return None, embedding
+            similarities = np.where(expires > time.time(), matrix @ embedding, -1.0)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                return values[best], embedding
+        return None, embedding
+
+    def store(self, namespace, text, value, embedding=None):
+        """
+        Adds `text -> value` to `namespace`, embedding the text unless `lookup` already did.
+        Each entry is written under its own key, so a store never rewrites the others.
+        """
+        if embedding is None:
+            embedding = self.embed(text)
+        if embedding is None:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            matrix, values, expires = self._index(namespace)
+            bloom = self._bloom(namespace)
+            if bloom is None:
+                bloom = ScalableBloomFilter(initial_capacity=10000, error_rate=0.01)
+                self._blooms[namespace] = bloom
+            # `add` returns True for shingles already in the filter; it is only re-pickled when one is new.
+            # Its expiry and the counter's are pushed back with every entry, so they outlive all of them.
+            if not all([bloom.add(shingle) for shingle in self.shingles(text)]):
+                self._store.set(("bloom", namespace), bloom, expire=self.ttl)
+            else:
+                self._store.touch(("bloom", namespace), expire=self.ttl)
+            index = self._store.incr(("semantic_count", namespace)) - 1
+            self._store.touch(("semantic_count", namespace), expire=self.ttl)
+            self._store.set(("semantic", namespace, index), (embedding, value, expires_at), expire=self.ttl)
+            matrix = np.vstack([matrix, embedding]) if values else embedding[np.newaxis, :]
+            self._indexes[namespace] = (matrix, values + [value], np.append(expires, expires_at))
+
+    def _might_contain(self, namespace, text):
+        with self._lock:
+            bloom = self._bloom(namespace)
+            if bloom is None:
+                return False
+            return any(shingle in bloom for shingle in self.shingles(text))
+
+    def _index(self, namespace):
+        if namespace not in self._indexes:
+            count = self._store.get(("semantic_count", namespace), 0)
+            entries = [entry for i in range(count)
+                       if (entry := self._store.get(("semantic", namespace, i))) is not None]
+            if entries:
+                embeddings, values, expires = zip(*entries)
+                self._indexes[namespace] = (np.vstack(embeddings), list(values), np.asarray(expires))
+            else:
+                self._indexes[namespace] = (None, [], np.empty(0))
+        return self._indexes[namespace]
+
+    def _bloom(self, namespace):
+        if namespace not in self._blooms:
+            self._blooms[namespace] = self._store.get(("bloom", namespace))
+        return self._blooms[namespace]
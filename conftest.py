@@ -0,0 +1,2 @@
+# Lets a plain `pytest` import the app's top-level modules: pytest puts this
+# file's directory (the repository root) on sys.path when it loads it.
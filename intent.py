@@ -0,0 +1,19 @@
+import re
+
+# Replies that are nothing but a request for help or a give-up are classified locally.
+# The whole reply must match, since words like "help", "skip" or "explain" also appear
+# inside genuine answers; everything else goes to Gemini.
+_HINT_PATTERN = re.compile(
+    r"^(hint|hint please|a hint please|give me a hint|can i (get|have) a hint( please)?|help|help please)[.!?]*$")
+_UNCERTAIN_PATTERN = re.compile(
+    r"^(idk|i don'?t know|no idea|not sure|i'?m not sure|skip|pass)[.!?]*$")
+
+
+def fast_intent(answer):
+    """Returns 'HINT_REQUEST' or 'UNCERTAIN' for replies that are only that, otherwise None."""
+    normalized = " ".join(answer.lower().replace("’", "'").split())
+    if _HINT_PATTERN.match(normalized):
+        return "HINT_REQUEST"
+    if _UNCERTAIN_PATTERN.match(normalized):
+        return "UNCERTAIN"
+    return None
@@ -1,8 +1,20 @@
 import os
+import copy
 import json
 import time
+import threading
+import string
+import enum
+from typing import TypedDict
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import tenacity
 import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted
 import streamlit as st
+from cache import LLMCache
+from rate_limiter import RateLimiter
+from intent import fast_intent
 
 # --- Configuration and Setup ---
 try:
@@ -19,119 +31,580 @@ except Exception as e:
     api_key = None
 
 
+def _get_setting(name, default):
+    """Reads `name` from Streamlit secrets, then the environment, converted to the type of `default`."""
+    try:
+        value = st.secrets.get(name)
+    except Exception:
+        value = None
+    if value is None:
+        value = os.environ.get(name)
+    return default if value is None else type(default)(value)
+
+
+SAFETY_SETTINGS = (
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+)
+DEFAULT_MODEL_NAME = "gemini-1.5-flash"
+TECHNICAL_SKILLS = ["Data Cleaning", "Data Analysis", "Data Summarization"]
+# Template for each agent's skill scores; agents work on a deep copy.
+DEFAULT_SKILL_SCORES = {
+    "Data Cleaning": {"status": "Untested", "score": 0, "efficiency": 0},
+    "Data Analysis": {"status": "Untested", "score": 0, "efficiency": 0},
+    "Data Summarization": {"status": "Untested", "score": 0, "efficiency": 0},
+    "Behavioral": {"status": "Untested", "score": 0}
+}
+# Process-wide request budget shared by every session. The default is the free-tier limit
+# for gemini-1.5-flash; set GEMINI_REQUESTS_PER_MINUTE in secrets or the environment for paid tiers.
+GEMINI_REQUESTS_PER_MINUTE = _get_setting("GEMINI_REQUESTS_PER_MINUTE", 15)
+# Longest a call waits for the rate limiter before failing, rather than queueing indefinitely.
+RATE_LIMIT_MAX_WAIT = 30
+# Attempts for rate-limited (429 / ResourceExhausted) calls, with jittered exponential backoff.
+MAX_RATE_LIMIT_ATTEMPTS = 5
+RATE_LIMIT_BASE_DELAY = 1.0
+# Enough for a JSON-quoted intent such as "HINT_REQUEST", so decoding stops right after it.
+INTENT_MAX_OUTPUT_TOKENS = 8
+# Generated case studies, keyed by role, persisted so restarts reuse them until they expire.
+CASE_STUDY_STORE = "case_study_cache.json"
+# How long a role keeps the same case study (and so the same questions), in memory and on disk.
+CASE_STUDY_TTL_SECONDS = 3600
+# Append-only interview logs, one JSON object per line.
+INTERVIEW_LOG = "interview_logs.jsonl"
+
+
+# --- Response Schemas (Gemini structured output) ---
+class CaseStudySchema(TypedDict):
+    scenario: str
+    dataset_description: str
+
+
+# Skill names contain spaces, so this schema uses the functional TypedDict form.
+TechnicalQuestionsSchema = TypedDict("TechnicalQuestionsSchema", {skill: str for skill in TECHNICAL_SKILLS})
+
+
+class Intent(enum.Enum):
+    ANSWERING = "ANSWERING"
+    HINT_REQUEST = "HINT_REQUEST"
+    UNCERTAIN = "UNCERTAIN"
+
+
+class EvaluationSchema(TypedDict):
+    score: int
+    justification: str
+    efficiency_score: int
+    efficiency_justification: str
+    bot_response: str
+
+
+class TechnicalTurnSchema(EvaluationSchema):
+    intent: Intent
+    hint: str
+
+
+class BehavioralEvaluationSchema(TypedDict):
+    score: int
+    justification: str
+
+
+# --- Static Interview Context ---
+# Part of the per-interview static context sent with every turn (see `_build_static_context`).
+SKILL_DEFINITIONS = """Skill definitions:
+- Data Cleaning: fixing inconsistent formats, casing, whitespace, duplicates and missing values (e.g. TRIM, PROPER, Remove Duplicates, Power Query).
+- Data Analysis: deriving answers from the data with formulas, lookups and conditional aggregation (e.g. XLOOKUP, SUMIFS, COUNTIFS).
+- Data Summarization: presenting results clearly with PivotTables, charts and concise written summaries.
+"""
+
+EVALUATION_RUBRIC = """Scoring rubric:
+- "score" (correctness, 1-5): 5 = correct and complete, 3 = partially correct or missing key steps, 1 = incorrect or off-topic.
+- "efficiency_score" (1-5): 5 = the most direct Excel approach using built-in features, 3 = workable but roundabout, 1 = laborious or manual.
+"""
+
+# --- Prompt Templates ---
+# Static instructions come first and the per-turn values last, so consecutive calls share
+# the longest possible prefix (after the agent's `_static_context`) for Gemini's implicit caching.
+NEXT_QUESTION_TEMPLATE = string.Template("""
+        Formulate a single, clear question to test the skill below using the case study context.
+        Return ONLY the question as a string.
+        Skill to assess: **$skill**
+        """)
+
+EVALUATION_TEMPLATE = string.Template("""
+        You are an expert Senior Analyst evaluating a candidate's response.
+        Score "score" and "efficiency_score" using the scoring rubric, justifying each,
+        and write "bot_response" as a short, conversational reply to the candidate.
+        The skill being tested is: **$skill**.
+        The question was: "$question"
+        The candidate's answer was: "$answer"
+        """)
+
+TECHNICAL_TURN_TEMPLATE = string.Template("""
+        You are an expert Senior Analyst reviewing a candidate's reply during a case study.
+        First classify the reply's "intent":
+        - 'ANSWERING': The candidate is directly trying to answer the question.
+        - 'HINT_REQUEST': The candidate is asking for a hint, help, or clarification.
+        - 'UNCERTAIN': The candidate states they don't know the answer or are unsure.
+        If ANSWERING, score "score" and "efficiency_score" using the scoring rubric, justifying each,
+        and write "bot_response" as a short, conversational reply to the candidate.
+        If HINT_REQUEST, write "hint" as a brief, encouraging hint that does not give away the answer.
+        Leave every field that does not apply to the intent empty or 0.
+        The skill being tested is: **$skill**.
+        The question was: "$question"
+        The candidate's reply was: "$answer"
+        """)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_model(model_name):
+    """Shares one GenerativeModel (and its underlying client) per model name across agents and sessions."""
+    return genai.GenerativeModel(model_name)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_response_cache():
+    """The process-wide persistent response cache (see cache.py)."""
+    return LLMCache()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_rate_limiter():
+    """The token bucket guarding every Gemini generation call in this process."""
+    return RateLimiter(GEMINI_REQUESTS_PER_MINUTE, 60.0)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_log_executor():
+    """Worker threads that persist interview logs off the request thread."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="interview-log")
+
+
+@st.cache_resource(show_spinner=False)
+def _get_cache_executor():
+    """Worker threads that embed and store cache entries off the request thread."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="response-cache")
+
+
+_retry_on_rate_limit = tenacity.retry(
+    wait=tenacity.wait_exponential_jitter(initial=RATE_LIMIT_BASE_DELAY),
+    retry=tenacity.retry_if_exception_type(ResourceExhausted),
+    stop=tenacity.stop_after_attempt(MAX_RATE_LIMIT_ATTEMPTS),
+    reraise=True,
+)
+
+
+@_retry_on_rate_limit
+def _rate_limited(call, *args, **kwargs):
+    """
+    Runs a Gemini call within the shared rate limit, retrying on ResourceExhausted.
+    Raises TimeoutError (not retried) if the limiter's queue is longer than RATE_LIMIT_MAX_WAIT.
+    """
+    _get_rate_limiter().acquire(timeout=RATE_LIMIT_MAX_WAIT)
+    return call(*args, **kwargs)
+
+
+def _generate(model_name, prompt, schema=None, max_output_tokens=None):
+    """Calls the shared base model directly. Unlike `_call_gemini`, failures raise."""
+    response = _rate_limited(
+        _get_model(model_name).generate_content, prompt, safety_settings=SAFETY_SETTINGS,
+        generation_config=JobWinningInterviewAgent._generation_config(schema, max_output_tokens))
+    return JobWinningInterviewAgent._parse_response(response, schema)
+
+
+@st.cache_data(ttl=CASE_STUDY_TTL_SECONDS, show_spinner=False)
+def _generate_case_study(role, model_name):
+    """
+    Generates a case study for `role`, returning it with its creation time. Shared
+    across sessions for CASE_STUDY_TTL_SECONDS; failures raise, so they are never cached.
+    """
+    prompt = f"""
+    You are an AI Interviewer creating a case study for a '{role}' role.
+    Create a realistic business scenario with a simple, messy, text-based dataset.
+    The dataset description must include column headers and at least 3 sample rows.
+    "scenario" is a detailed business scenario.
+    "dataset_description" describes the dataset columns and a few example rows. For example: 'The dataset has three columns: Product ID, Sale Date, and Revenue. Here are a few rows:\\n- P001 | 2024-01-15 | $ 1500.00\\n- p002 | 2024-01-16 | $950.50\\n- P001 | 2024-01-17| $ 1550.0'
+    """
+    return _generate(model_name, prompt, CaseStudySchema), time.time()
+
+
+def get_case_study(role, model_name=DEFAULT_MODEL_NAME):
+    """
+    The case study for `role`: read from CASE_STUDY_STORE while it is fresh, otherwise
+    generated (via the cached `_generate_case_study`) and written back with its creation time.
+    """
+    case_study = _load_stored_case_study(role)
+    if case_study is None:
+        case_study, created_at = _generate_case_study(role, model_name)
+        _store_case_study(role, case_study, created_at)
+    return case_study
+
+
+def prewarm(roles, model_name=DEFAULT_MODEL_NAME):
+    """
+    Creates the shared model handle and generates each role's case study ahead of
+    the first interview. Meant to run on a background thread at app start.
+    """
+    _get_model(model_name)
+    for role in roles:
+        try:
+            get_case_study(role, model_name)
+        except Exception as e:
+            print(f"--- Could not prewarm case study for '{role}': {e} ---")
+
+
+# Serializes access to CASE_STUDY_STORE between the prewarm thread and session threads.
+_CASE_STUDY_LOCK = threading.Lock()
+
+
+def _read_case_study_store():
+    try:
+        with open(CASE_STUDY_STORE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _load_stored_case_study(role):
+    """The stored case study for `role`, or None if there is none or it is older than CASE_STUDY_TTL_SECONDS."""
+    with _CASE_STUDY_LOCK:
+        entry = _read_case_study_store().get(role)
+    if not isinstance(entry, dict) or time.time() - entry.get("created_at", 0) > CASE_STUDY_TTL_SECONDS:
+        return None
+    return entry.get("case_study")
+
+
+def _store_case_study(role, case_study, created_at):
+    # Written to a temporary file and swapped in, so readers never see a partial file.
+    temp_path = f"{CASE_STUDY_STORE}.tmp"
+    with _CASE_STUDY_LOCK:
+        stored = _read_case_study_store()
+        stored[role] = {"case_study": case_study, "created_at": created_at}
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(stored, f)
+            os.replace(temp_path, CASE_STUDY_STORE)
+        except OSError as e:
+            print(f"Could not save case study cache: {e}")
+
+
+_LOG_LOCK = threading.Lock()
+
+
+def _write_log(feedback_data):
+    try:
+        line = orjson.dumps(feedback_data, option=orjson.OPT_APPEND_NEWLINE)
+        with _LOG_LOCK, open(INTERVIEW_LOG, 'ab') as f:
+            f.write(line)
+        print(f"--- [Admin] Interview data saved to '{INTERVIEW_LOG}' for quality review. ---")
+    except Exception as e:
+        print(f"Could not save feedback log: {e}")
+
+
 class JobWinningInterviewAgent:
     """
     The core agent logic, with a corrected prompt for reliable dataset generation.
     """
-    def __init__(self, candidate_name, model_name="gemini-1.5-flash"):
+    def __init__(self, candidate_name, model_name=DEFAULT_MODEL_NAME, cheap_model_name="gemini-1.5-flash-8b"):
         if not api_key:
             raise ValueError("Gemini API key is not configured. Please set it in your Streamlit secrets.")
         self.candidate_name = candidate_name
-        self.model = genai.GenerativeModel(model_name)
+        self.model_name = model_name
+        # Lighter model for the short, self-contained intent and hint calls.
+        self.cheap_model_name = cheap_model_name
+        self.model = _get_model(model_name)
         self.interview_role = None
-        self.skill_profile = {
-            "Data Cleaning": {"status": "Untested", "score": 0, "efficiency": 0, "evidence": ""},
-            "Data Analysis": {"status": "Untested", "score": 0, "efficiency": 0, "evidence": ""},
-            "Data Summarization": {"status": "Untested", "score": 0, "efficiency": 0, "evidence": ""},
-            "Behavioral": {"status": "Untested", "score": 0, "evidence": ""}
-        }
+        # Scores and the latest evidence per skill are kept apart; `get_skill_profile` joins them.
+        self._skill_scores = copy.deepcopy(DEFAULT_SKILL_SCORES)
+        self._skill_evidence = {}
         self.case_study_data = None
-        self.conversation_history = []
+        # The static case-study context (role, scenario, dataset, rubric, skill definitions)
+        # that prefixes every per-turn prompt.
+        self._static_context = ""
+        # Questions generated up front by `_generate_all_technical_questions`, keyed by skill.
+        self.pending_questions = {}
 
-    def _call_gemini(self, prompt, is_json=False):
-        """Helper to call the Gemini API and handle responses."""
+    def _call_gemini(self, prompt, schema=None):
+        """
+        Helper to call the Gemini API and handle responses.
+        When a `schema` is given, Gemini's JSON mode is used and the parsed result is returned;
+        failures then raise, as there is no sensible stand-in for structured data. Text
+        calls return an apology for the candidate instead.
+        """
+        if schema is not None:
+            return self._request(prompt, schema)
         try:
-            safety_settings = [
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-            ]
-            response = self.model.generate_content(prompt, safety_settings=safety_settings)
-            if is_json:
-                text = response.text.strip().lstrip("```json").rstrip("```")
-                return json.loads(text)
-            return response.text
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"--- Model or JSON Error: {e} ---")
-            if is_json:
-                return {"error": "Failed to get a valid response from the model.", "scenario": "Error", "dataset_description": "Error"}
-            return "My apologies, I encountered a system error. Let's try the next step."
+            return self._request(prompt)
+        except Exception as e:
+            return self._error_response(e)
+
+    def _request(self, prompt, schema=None):
+        """Like `_call_gemini`, but failures raise instead of returning `_error_response`."""
+        response = _rate_limited(self.model.generate_content, prompt, safety_settings=SAFETY_SETTINGS,
+                                 generation_config=self._generation_config(schema))
+        return self._parse_response(response, schema)
+
+    def _call_gemini_cached(self, prompt, schema=None, model_name=None, max_output_tokens=None):
+        """
+        Like `_call_gemini` (including how failures surface), but identical prompts are
+        answered from the persistent response cache. Uses a base model (the agent's own unless
+        `model_name` is given), so only suitable for prompts that carry all their own context.
+        """
+        model_name = model_name or self.model_name
+        response_cache = _get_response_cache()
+        key = LLMCache.make_key(model_name, prompt, getattr(schema, "__name__", None), max_output_tokens)
+        if (hit := response_cache.get(key)) is not None:
+            return hit
+        try:
+            result = _generate(model_name, prompt, schema, max_output_tokens)
+        except Exception as e:
+            if schema is not None:
+                raise
+            return self._error_response(e)
+        response_cache.set(key, result)
+        return result
+
+    def _call_gemini_stream(self, prompt):
+        """Yields the response text chunk by chunk as Gemini generates it."""
+        try:
+            for chunk in _rate_limited(self.model.generate_content, prompt, stream=True, safety_settings=SAFETY_SETTINGS):
+                yield chunk.text
+        except Exception as e:
+            yield self._error_response(e)
+
+    @staticmethod
+    def _generation_config(schema, max_output_tokens=None):
+        if schema is None and max_output_tokens is None:
+            return None
+        if schema is None:
+            return genai.GenerationConfig(max_output_tokens=max_output_tokens)
+        return genai.GenerationConfig(response_mime_type="application/json", response_schema=schema,
+                                      max_output_tokens=max_output_tokens)
+
+    @staticmethod
+    def _parse_response(response, schema):
+        if schema is not None:
+            return orjson.loads(response.text)
+        return response.text
+
+    @staticmethod
+    def _error_response(e):
+        print(f"--- Model Error: {e} ---")
+        return "My apologies, I encountered a system error. Let's try the next step."
+
+    def get_skill_profile(self):
+        """Returns a copy of the per-skill view (status, scores and latest evidence) for the report and log."""
+        return {skill: dict(scores, evidence=self._skill_evidence.get(skill, ""))
+                for skill, scores in self._skill_scores.items()}
+
+    def skip_skill(self, skill):
+        self._skill_scores[skill]["status"] = "Skipped"
+
+    def checkpoint(self):
+        """Snapshot of the state a turn changes (scores, evidence, pending questions), for `restore`."""
+        return copy.deepcopy(self._skill_scores), dict(self._skill_evidence), dict(self.pending_questions)
+
+    def restore(self, checkpoint):
+        """Undoes a rolled-back turn's changes, putting back any question it used up."""
+        skill_scores, skill_evidence, pending_questions = checkpoint
+        self._skill_scores = copy.deepcopy(skill_scores)
+        self._skill_evidence = dict(skill_evidence)
+        self.pending_questions.update(pending_questions)
 
     def _introduce_case_study(self):
         """
         UPDATED: This prompt is now much more specific to ensure the AI returns the
         dataset description in the correct format every time.
+        Case studies are shared per role via `get_case_study`.
         """
-        prompt = f"""
-        You are an AI Interviewer creating a case study for a '{self.interview_role}' role.
-        Create a realistic business scenario with a simple, messy, text-based dataset.
-        The dataset description must include column headers and at least 3 sample rows.
-        Return ONLY a JSON object in the following format, with no other text before or after it:
-        {{
-          "scenario": "A detailed business scenario goes here.",
-          "dataset_description": "A description of the dataset columns and a few example rows. For example: 'The dataset has three columns: Product ID, Sale Date, and Revenue. Here are a few rows:\\n- P001 | 2024-01-15 | $ 1500.00\\n- p002 | 2024-01-16 | $950.50\\n- P001 | 2024-01-17| $ 1550.0'"
-        }}
-        """
-        self.case_study_data = self._call_gemini(prompt, is_json=True)
+        try:
+            self.case_study_data = get_case_study(self.interview_role, self.model_name)
+        except Exception as e:
+            print(f"--- Could not generate a case study: {e} ---")
+            self.case_study_data = {"error": str(e), "scenario": "Error", "dataset_description": "Error"}
+        if "error" not in self.case_study_data:
+            self._build_static_context()
         return f"Okay, let's dive into a practical case study.\n\n**Scenario:** {self.case_study_data.get('scenario')}\n\n**Dataset:**\n\n```text\n{self.case_study_data.get('dataset_description')}\n```\n\nLet's tackle this in a few steps. First, let's talk about cleaning this data."
 
+    def _build_static_context(self):
+        """
+        Builds the role/scenario/dataset/rubric block that prefixes every per-turn prompt.
+        It is sent inline: at a few hundred tokens it is far below the minimum size Gemini
+        accepts for an explicit CachedContent.
+        """
+        role_instruction = f"You are an AI Interviewer guiding a candidate through a case study for a '{self.interview_role}' role.\n"
+        context = (
+            f"The overall scenario is: \"{self.case_study_data.get('scenario')}\"\n"
+            f"The dataset is: \"{self.case_study_data.get('dataset_description')}\"\n"
+        )
+        self._static_context = role_instruction + context + EVALUATION_RUBRIC + SKILL_DEFINITIONS
+
     # ... The rest of the methods remain unchanged ...
 
-    def _ask_next_question(self, skill_to_test):
-        prompt = f"""
-        You are an AI Interviewer guiding a candidate through a case study for a '{self.interview_role}' role.
-        The overall scenario is: "{self.case_study_data.get('scenario')}"
-        The dataset is: "{self.case_study_data.get('dataset_description')}"
-        Your current goal is to assess their skill in: **{skill_to_test}**.
-        Formulate a single, clear question to test this skill using the case study context.
-        Return ONLY the question as a string.
+    def _next_question_prompt(self, skill_to_test):
+        return self._static_context + NEXT_QUESTION_TEMPLATE.safe_substitute(skill=skill_to_test)
+
+    def _generate_all_technical_questions(self):
         """
-        return self._call_gemini(prompt)
+        Generates the question for every technical skill in a single Gemini call.
+        The call is made for each interview and not cached, so candidates for the same
+        role do not get the same questions.
+        """
+        if not self._static_context:
+            return
+        prompt = self._static_context + f"""
+        Formulate one clear question per skill to assess the candidate using the case study context.
+        The skills are: {", ".join(TECHNICAL_SKILLS)}.
+        Return each question keyed by its skill name.
+        """
+        try:
+            questions = self._call_gemini(prompt, schema=TechnicalQuestionsSchema)
+        except Exception as e:
+            # Each question is then generated when it is asked.
+            print(f"--- Could not generate the technical questions: {e} ---")
+            return
+        self.pending_questions = {skill: q for skill, q in questions.items() if skill in TECHNICAL_SKILLS and q}
 
-    def _check_user_intent(self, answer):
-        prompt = f"""
+    def _ask_next_question_stream(self, skill_to_test):
+        """Yields the question for `skill_to_test`, streaming it when it has to be generated now."""
+        if question := self.pending_questions.pop(skill_to_test, None):
+            yield question
+            return
+        yield from self._call_gemini_stream(self._next_question_prompt(skill_to_test))
+
+    @staticmethod
+    def _intent_prompt(answer):
+        return f"""
         Analyze the user's response: "{answer}".
         Determine the user's intent. Choose ONLY ONE from the following options:
         - 'ANSWERING': The user is directly trying to answer the question.
         - 'HINT_REQUEST': The user is asking for a hint, help, or clarification.
         - 'UNCERTAIN': The user states they don't know the answer or are unsure.
-        Return ONLY the single-word intent.
         """
-        return self._call_gemini(prompt).strip()
+
+    def _check_user_intent(self, answer):
+        if intent := fast_intent(answer):
+            return intent
+        normalized = " ".join(answer.lower().split())
+        # The bare enum schema makes Gemini emit exactly one of the three values.
+        return self._call_gemini_cached(self._intent_prompt(normalized), schema=Intent,
+                                        model_name=self.cheap_model_name,
+                                        max_output_tokens=INTENT_MAX_OUTPUT_TOKENS)
 
     def _generate_hint(self, question):
         prompt = f"The user is stuck on this question: '{question}'. Provide a brief, encouraging hint to guide them in the right direction without giving away the answer."
-        return self._call_gemini(prompt)
+        return self._call_gemini_cached(prompt, model_name=self.cheap_model_name)
         
     def _evaluate_technical_answer(self, question, answer, skill_being_tested):
-        prompt = f"""
-        You are an expert Senior Analyst evaluating a candidate's response.
-        The skill being tested is: **{skill_being_tested}**.
-        The question was: "{question}"
-        The candidate's answer was: "{answer}"
-        Return ONLY a JSON object:
-        {{
-          "score": <1-5>,
-          "justification": "<Reasoning for correctness score>",
-          "efficiency_score": <1-5>,
-          "efficiency_justification": "<Reasoning for efficiency score>",
-          "bot_response": "<A short, conversational reply to the candidate>"
-        }}
-        """
-        evaluation = self._call_gemini(prompt, is_json=True)
-        self.skill_profile[skill_being_tested].update({
+        prompt = self._static_context + EVALUATION_TEMPLATE.safe_substitute(
+            skill=skill_being_tested, question=question, answer=answer)
+        evaluation = self._call_gemini(prompt, schema=EvaluationSchema)
+        self._record_technical_evaluation(question, answer, skill_being_tested, evaluation)
+        return evaluation.get("bot_response", "Okay, thank you for that.")
+
+    def _record_technical_evaluation(self, question, answer, skill_being_tested, evaluation):
+        self._skill_scores[skill_being_tested].update({
             "status": "Assessed",
             "score": evaluation.get("score", 0),
             "efficiency": evaluation.get("efficiency_score", 0),
-            "evidence": f"Q: {question}\nA: {answer}\nEval: {evaluation.get('justification')}\nEfficency: {evaluation.get('efficiency_justification')}"
         })
-        return evaluation.get("bot_response", "Okay, thank you for that.")
+        self._skill_evidence[skill_being_tested] = (
+            f"Q: {question}\nA: {answer}\n"
+            f"Eval: {evaluation.get('justification')}\nEfficency: {evaluation.get('efficiency_justification')}")
+
+    def _technical_turn_prompt(self, question, answer, skill_being_tested):
+        return self._static_context + TECHNICAL_TURN_TEMPLATE.safe_substitute(
+            skill=skill_being_tested, question=question, answer=answer)
+
+    def _apply_technical_turn(self, question, answer, skill_being_tested, result):
+        """
+        Turns a merged intent/evaluation result into `(intent, reply)`, recording the
+        score when the candidate answered. `reply` is None for UNCERTAIN.
+        """
+        intent = result.get("intent")
+        if intent is None:
+            return self._separate_technical_turn(question, answer, skill_being_tested)
+        if intent == "ANSWERING":
+            self._record_technical_evaluation(question, answer, skill_being_tested, result)
+            return intent, result.get("bot_response") or "Okay, thank you for that."
+        if intent == "HINT_REQUEST":
+            return intent, result.get("hint") or self._generate_hint(question)
+        return intent, None
+
+    def _separate_technical_turn(self, question, answer, skill_being_tested):
+        """
+        The separate intent and evaluation calls, used when the merged call fails.
+        If these fail too, the error reaches the caller.
+        """
+        intent = self._check_user_intent(answer)
+        if intent == "ANSWERING":
+            return intent, self._evaluate_technical_answer(question, answer, skill_being_tested)
+        if intent == "HINT_REQUEST":
+            return intent, self._generate_hint(question)
+        return intent, None
+
+    def _fast_technical_turn(self, question, answer):
+        """Resolves obvious hint requests and give-ups without the merged evaluation call."""
+        intent = fast_intent(answer)
+        if intent == "HINT_REQUEST":
+            return intent, self._generate_hint(question)
+        if intent == "UNCERTAIN":
+            return intent, None
+        return None
 
-    def _ask_and_evaluate_behavioral(self):
+    def _technical_turn_namespace(self, question, skill_being_tested):
+        # Replies are only comparable when they answer the same question; partitioned per
+        # (role, skill) so each lookup only scans answers from that slice of interviews.
+        return LLMCache.make_key("technical_turn", self.model_name, self.interview_role, skill_being_tested, question)
+
+    def _store_technical_hint(self, namespace, answer, embedding, result):
+        # Only the hint is shared between similar replies; a score is never reused for a different answer.
+        if result.get("intent") != "HINT_REQUEST" or not result.get("hint"):
+            return
+        hint = {"intent": "HINT_REQUEST", "hint": result["hint"]}
+        response_cache = _get_response_cache()
+        if embedding is None:
+            # The lookup skipped embedding a reply unlike any stored one; embed it off the critical path.
+            _get_cache_executor().submit(response_cache.store, namespace, answer, hint)
+        else:
+            response_cache.store(namespace, answer, hint, embedding)
+
+    def _technical_turn_result(self, question, answer, skill_being_tested):
+        """
+        The merged intent/evaluation result. The full result is reused only for the same
+        normalized reply; a near-identical hint request reuses just the hint.
+        """
+        response_cache = _get_response_cache()
+        namespace = self._technical_turn_namespace(question, skill_being_tested)
+        key = LLMCache.make_key(namespace, " ".join(answer.lower().split()))
+        if (hit := response_cache.get(key)) is not None:
+            return hit
+        cached, embedding = response_cache.lookup(namespace, answer)
+        if cached is not None:
+            return cached
+        result = self._call_gemini(self._technical_turn_prompt(question, answer, skill_being_tested), schema=TechnicalTurnSchema)
+        if "intent" in result:
+            response_cache.set(key, result)
+        self._store_technical_hint(namespace, answer, embedding, result)
+        return result
+
+    def _respond_to_technical_answer(self, question, answer, skill_being_tested):
+        """
+        Classifies the reply and evaluates it (or writes a hint) in a single Gemini call,
+        returning `(intent, reply)`.
+        """
+        if fast_turn := self._fast_technical_turn(question, answer):
+            return fast_turn
+        try:
+            result = self._technical_turn_result(question, answer, skill_being_tested)
+        except Exception as e:
+            print(f"--- Merged technical turn failed, using separate calls: {e} ---")
+            return self._separate_technical_turn(question, answer, skill_being_tested)
+        return self._apply_technical_turn(question, answer, skill_being_tested, result)
+
+    def _ask_behavioral_stream(self):
         prompt = "Ask one standard behavioral interview question, like 'Tell me about a challenging project' or 'Describe a time you made a mistake'."
-        question = self._call_gemini(prompt)
-        return question
+        return self._call_gemini_stream(prompt)
 
     def evaluate_behavioral_answer(self, question, answer):
         eval_prompt = f"""
@@ -141,22 +614,20 @@ class JobWinningInterviewAgent:
         Evaluate the answer's structure and clarity (e.g., STAR method).
         Assign a score from 1 (unstructured) to 5 (clear and well-structured).
         Provide a brief justification.
-        Return ONLY a JSON object: {{"score": <1-5>, "justification": "<Your reasoning>"}}
         """
-        evaluation = self._call_gemini(eval_prompt, is_json=True)
-        self.skill_profile["Behavioral"].update({
+        evaluation = self._call_gemini(eval_prompt, schema=BehavioralEvaluationSchema)
+        self._skill_scores["Behavioral"].update({
             "status": "Assessed",
             "score": evaluation.get("score", 0),
-            "evidence": f"Q: {question}\nA: {answer}\nEval: {evaluation.get('justification')}"
         })
+        self._skill_evidence["Behavioral"] = f"Q: {question}\nA: {answer}\nEval: {evaluation.get('justification')}"
         return "Thank you for sharing that."
     
-    def generate_final_report(self):
-        """Generates the final, structured performance report."""
-        summary_prompt = f"""
+    def _final_report_prompt(self, skill_profile):
+        return f"""
         You are a Senior Hiring Manager creating a final candidate report.
         **Candidate Name:** {self.candidate_name}, **Role:** {self.interview_role}
-        **Final Skill Profile:** {json.dumps(self.skill_profile, indent=2)}
+        **Final Skill Profile:** {json.dumps(skill_profile, indent=2)}
         **Your Task:**
         Write a formal, structured performance report in Markdown. The report must include:
         1. **Overall Summary:** A brief overview.
@@ -165,22 +636,27 @@ class JobWinningInterviewAgent:
         4. **Behavioral Competency:** Comment on the structure and clarity of their behavioral answer.
         5. **Final Recommendation:** (Strongly Recommend, Recommend, Recommend with Reservations, Do Not Recommend) with a one-sentence justification.
         """
-        final_report = self._call_gemini(summary_prompt)
 
+    def stream_final_report(self, transcript):
+        """
+        Streams the final report as it is generated, then saves the interview log
+        (with `transcript`, the chat messages) once the full report text is known.
+        """
+        skill_profile = self.get_skill_profile()
+        chunks = []
+        for chunk in self._call_gemini_stream(self._final_report_prompt(skill_profile)):
+            chunks.append(chunk)
+            yield chunk
+        self._save_feedback_log("".join(chunks), skill_profile, transcript)
+
+    def _save_feedback_log(self, final_report, skill_profile, transcript):
         feedback_data = {
             "candidate_name": self.candidate_name,
             "interview_role": self.interview_role,
-            "final_skill_profile": self.skill_profile,
+            "final_skill_profile": skill_profile,
             "ai_generated_report": final_report,
-            "full_transcript": self.conversation_history,
+            "full_transcript": list(transcript),
             "timestamp": time.time()
         }
-        filename = f"interview_log_{self.candidate_name.replace(' ','_')}_{int(time.time())}.json"
-        try:
-            with open(filename, 'w') as f:
-                json.dump(feedback_data, f, indent=4)
-            print(f"--- [Admin] Interview data saved to '{filename}' for quality review. ---")
-        except Exception as e:
-            print(f"Could not save feedback log: {e}")
-        
-        return final_report
+        # Written off the request thread so the report is not held up by disk I/O.
+        _get_log_executor().submit(_write_log, feedback_data)
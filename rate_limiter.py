@@ -0,0 +1,35 @@
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing `rate` requests per `period` seconds (bursts of up
+    to `rate`), so one instance can guard every Gemini call in the process, whichever
+    session thread it comes from.
+    """
+    def __init__(self, rate, period=60.0):
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Takes a token if one is available; otherwise returns the seconds until one will be."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.fill_rate
+
+    def acquire(self, timeout=None):
+        """Blocks until a token is taken, raising TimeoutError if that would take longer than `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while (wait := self._take()) > 0:
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TimeoutError(f"Rate limit wait exceeded {timeout} seconds")
+            time.sleep(wait)
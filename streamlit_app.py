@@ -1,6 +1,13 @@
 import streamlit as st
 import time
-from interviewer import JobWinningInterviewAgent, api_key
+import threading
+from collections import deque
+from interviewer import JobWinningInterviewAgent, api_key, prewarm, TECHNICAL_SKILLS
+from turns import once_per_turn
+
+ROLES = ["Data Analytics", "Finance", "Operations"]
+# Identical submissions closer together than this are treated as an accidental double-send.
+DEBOUNCE_SECONDS = 0.9
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -28,11 +35,31 @@ if 'current_question' not in st.session_state:
     st.session_state.current_question = None
 if 'current_skill' not in st.session_state:
     st.session_state.current_skill = None
+# Technical skills still to be asked, in order.
+if 'skill_queue' not in st.session_state:
+    st.session_state.skill_queue = deque()
 # NEW: State for handling the exit confirmation
 if 'confirm_exit' not in st.session_state:
     st.session_state.confirm_exit = False
+if 'report' not in st.session_state:
+    st.session_state.report = None
+# Snapshot of the turn being processed (prompt, history length, question, skill, stage,
+# agent checkpoint) plus the Gemini results it has received so far, kept until the turn
+# completes so an interrupted run can resume it without repeating those calls.
+if 'pending_turn' not in st.session_state:
+    st.session_state.pending_turn = None
+if 'last_prompt_hash' not in st.session_state:
+    st.session_state.last_prompt_hash = None
+    st.session_state.last_prompt_ts = 0.0
 
 # --- Helper Functions ---
+@st.cache_resource
+def start_prewarm():
+    """Starts warming the model and per-role case studies once per server process."""
+    thread = threading.Thread(target=prewarm, args=(ROLES,), daemon=True)
+    thread.start()
+    return thread
+
 def reset_interview():
     """NEW: Resets the entire session state to start over."""
     st.session_state.stage = 'start'
@@ -40,72 +67,182 @@ def reset_interview():
     st.session_state.agent = None
     st.session_state.current_question = None
     st.session_state.current_skill = None
+    st.session_state.skill_queue = deque()
     st.session_state.confirm_exit = False
-    st.success("Interview has been reset.")
-    time.sleep(2) # Give user time to see the message
+    st.session_state.report = None
+    st.session_state.pending_turn = None
+    st.session_state.last_prompt_hash = None
+    st.session_state.last_prompt_ts = 0.0
+    # A toast survives the caller's st.rerun() and dismisses itself, so nothing blocks here.
+    st.toast("Interview has been reset.", icon="✅")
+
+def post_message(role, content):
+    """Appends a message to the chat history and renders it in the current run."""
+    st.session_state.messages.append({"role": role, "content": content})
+    with st.chat_message(role):
+        st.markdown(content)
+
+def stream_message(chunks):
+    """Streams an assistant message as it is generated, then records the full text in the history."""
+    with st.chat_message("assistant"):
+        content = st.write_stream(chunks)
+    st.session_state.messages.append({"role": "assistant", "content": content})
+    return content
+
+def stream_question(chunks):
+    """
+    Streams a newly generated question, or re-posts the one an interrupted run of the
+    pending turn already generated. `chunks` is a generator, so it is only consumed when needed.
+    """
+    turn = st.session_state.pending_turn
+    if turn is not None and "next_question" in turn:
+        post_message("assistant", turn["next_question"])
+        return turn["next_question"]
+    question = stream_message(chunks)
+    if turn is not None:
+        turn["next_question"] = question
+    return question
 
 def start_interview(name, role):
     """Initializes the interview agent and moves to the case study stage."""
     st.session_state.agent = JobWinningInterviewAgent(candidate_name=name)
     st.session_state.agent.interview_role = role
-    st.session_state.messages = [{"role": "assistant", "content": f"Hello {name}! Welcome to the interview. The role is set to {role}."}]
+    st.session_state.skill_queue = deque(TECHNICAL_SKILLS)
+    st.session_state.messages = []
+    post_message("assistant", f"Hello {name}! Welcome to the interview. The role is set to {role}.")
     
     with st.spinner("AI is generating a custom case study for you..."):
         case_study_intro = st.session_state.agent._introduce_case_study()
+        st.session_state.agent._generate_all_technical_questions()
     
-    st.session_state.messages.append({"role": "assistant", "content": case_study_intro})
+    post_message("assistant", case_study_intro)
     st.session_state.stage = 'technical_interview'
     ask_next_technical_question()
 
 def ask_next_technical_question():
-    """Asks the next technical question based on the skill profile."""
-    technical_skills = ["Data Cleaning", "Data Analysis", "Data Summarization"]
-    next_skill_to_test = next((skill for skill in technical_skills if st.session_state.agent.skill_profile[skill]["status"] == "Untested"), None)
+    """Asks the next technical question from the skill queue."""
+    agent = st.session_state.agent
     
-    if next_skill_to_test:
+    if st.session_state.skill_queue:
+        next_skill_to_test = st.session_state.skill_queue.popleft()
         st.session_state.current_skill = next_skill_to_test
-        with st.spinner("AI is thinking of the next question..."):
-            question = st.session_state.agent._ask_next_question(next_skill_to_test)
+        question = stream_question(agent._ask_next_question_stream(next_skill_to_test))
         st.session_state.current_question = question
-        st.session_state.messages.append({"role": "assistant", "content": question})
     else:
         st.session_state.stage = 'behavioral_interview'
         ask_behavioral_question()
 
 def ask_behavioral_question():
     """Asks the behavioral question."""
-    st.session_state.messages.append({"role": "assistant", "content": "Great, that concludes the technical case study. Let's move on to one final behavioral question."})
-    with st.spinner("..."):
-        question = st.session_state.agent._ask_and_evaluate_behavioral()
-    st.session_state.current_question = question
-    st.session_state.messages.append({"role": "assistant", "content": question})
+    post_message("assistant", "Great, that concludes the technical case study. Let's move on to one final behavioral question.")
+    st.session_state.current_question = stream_question(st.session_state.agent._ask_behavioral_stream())
     
+def render_messages(messages):
+    """Renders the given chat messages."""
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
 def handle_user_response(prompt):
+    """
+    Handles a user response, persisting a snapshot of the turn until it completes.
+    If processing fails, the turn is rolled back so the candidate can resend the answer.
+    Duplicate submissions within DEBOUNCE_SECONDS are ignored.
+    """
+    prompt_hash = hash((prompt, st.session_state.stage))
+    now = time.monotonic()
+    if prompt_hash == st.session_state.last_prompt_hash and now - st.session_state.last_prompt_ts < DEBOUNCE_SECONDS:
+        return
+    st.session_state.last_prompt_hash = prompt_hash
+    st.session_state.last_prompt_ts = now
+
+    st.session_state.pending_turn = {
+        "prompt": prompt,
+        "turn_start": len(st.session_state.messages),
+        "question": st.session_state.current_question,
+        "skill": st.session_state.current_skill,
+        "skill_queue": list(st.session_state.skill_queue),
+        "stage": st.session_state.stage,
+        "agent_state": st.session_state.agent.checkpoint(),
+    }
+    post_message("user", prompt)
+    _run_pending_turn()
+
+def resume_pending_turn():
+    """
+    Re-runs a turn whose run was interrupted, without re-posting the user's message or
+    repeating the Gemini calls whose results the turn already holds.
+    """
+    turn = st.session_state.pending_turn
+    del st.session_state.messages[turn["turn_start"] + 1:]
+    _restore_turn_state(turn)
+    _run_pending_turn()
+
+def _restore_turn_state(turn):
+    st.session_state.current_question = turn["question"]
+    st.session_state.current_skill = turn["skill"]
+    st.session_state.skill_queue = deque(turn["skill_queue"])
+    st.session_state.stage = turn["stage"]
+
+def _run_pending_turn():
+    turn = st.session_state.pending_turn
+    try:
+        _process_user_response(turn["prompt"])
+    except Exception as e:
+        print(f"--- Error while handling a response: {e} ---")
+        del st.session_state.messages[turn["turn_start"]:]
+        _restore_turn_state(turn)
+        st.session_state.agent.restore(turn["agent_state"])
+        st.error("Sorry, something went wrong while processing your answer. Please send it again.")
+    st.session_state.pending_turn = None
+
+def _process_user_response(prompt):
     """Handles all user responses based on the current interview stage."""
-    st.session_state.messages.append({"role": "user", "content": prompt})
     agent = st.session_state.agent
     
     if st.session_state.stage == 'technical_interview':
         with st.spinner("AI is analyzing your answer..."):
-            intent = agent._check_user_intent(prompt)
-            if intent == "ANSWERING":
-                bot_response = agent._evaluate_technical_answer(st.session_state.current_question, prompt, st.session_state.current_skill)
-                st.session_state.messages.append({"role": "assistant", "content": bot_response})
-                ask_next_technical_question()
-            elif intent == "HINT_REQUEST":
-                hint = agent._generate_hint(st.session_state.current_question)
-                st.session_state.messages.append({"role": "assistant", "content": f"Of course. Here's a hint: {hint}"})
-            else: # UNCERTAIN
-                agent.skill_profile[st.session_state.current_skill]["status"] = "Skipped"
-                st.session_state.messages.append({"role": "assistant", "content": "No problem, let's move on."})
-                ask_next_technical_question()
+            # One call classifies and evaluates the answer; the next question was generated up front.
+            intent, reply = once_per_turn(
+                st.session_state.pending_turn, "result", lambda: agent._respond_to_technical_answer(
+                    st.session_state.current_question, prompt, st.session_state.current_skill))
+        if intent == "ANSWERING":
+            post_message("assistant", reply)
+            ask_next_technical_question()
+        elif intent == "HINT_REQUEST":
+            post_message("assistant", f"Of course. Here's a hint: {reply}")
+        else: # UNCERTAIN
+            agent.skip_skill(st.session_state.current_skill)
+            post_message("assistant", "No problem, let's move on.")
+            ask_next_technical_question()
 
     elif st.session_state.stage == 'behavioral_interview':
         with st.spinner("AI is analyzing your answer..."):
-            bot_response = agent.evaluate_behavioral_answer(st.session_state.current_question, prompt)
-        st.session_state.messages.append({"role": "assistant", "content": bot_response})
+            bot_response = once_per_turn(
+                st.session_state.pending_turn, "result", lambda: agent.evaluate_behavioral_answer(
+                    st.session_state.current_question, prompt))
+        post_message("assistant", bot_response)
         st.session_state.stage = 'report'
 
+@st.fragment
+def chat_fragment():
+    """
+    The chat transcript and input. Submitting an answer reruns only this fragment,
+    not the header, sidebar and the rest of the script; moving on to the report
+    triggers a full rerun.
+    """
+    render_messages(st.session_state.messages)
+    prompt = st.chat_input("Your answer...")
+    if st.session_state.pending_turn is not None:
+        # The previous run was interrupted mid-turn; finish it before taking new input.
+        resume_pending_turn()
+        if prompt:
+            st.warning("Your last message arrived while the previous answer was still being processed. Please send it again.")
+    elif prompt:
+        handle_user_response(prompt)
+    if st.session_state.stage == 'report':
+        st.rerun(scope="app")
+
 # --- UI Rendering ---
 
 # Check for API Key first
@@ -114,10 +251,11 @@ if not api_key:
     st.info("Please add your GEMINI_API_KEY to your Streamlit secrets to run this app.")
 else:
     if st.session_state.stage == 'start':
+        start_prewarm()
         st.header("🏁 Get Started")
         with st.form("start_form"):
             name = st.text_input("Enter your name", "Candidate")
-            role = st.selectbox("Select the role you're applying for", ["Data Analytics", "Finance", "Operations"])
+            role = st.selectbox("Select the role you're applying for", ROLES)
             submitted = st.form_submit_button("Start Interview")
             if submitted:
                 start_interview(name, role)
@@ -145,21 +283,19 @@ else:
                     st.rerun()
         
         # The main chat interface
-        for message in st.session_state.messages:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
-        if prompt := st.chat_input("Your answer..."):
-            handle_user_response(prompt)
-            st.rerun()
+        chat_fragment()
 
     elif st.session_state.stage == 'report':
         st.header("📊 Your Performance Report")
         st.balloons()
         st.success("Congratulations on completing the interview!")
-        with st.spinner("Generating your detailed feedback report..."):
-            report = st.session_state.agent.generate_final_report()
-            st.markdown(report)
-            st.info("A detailed log of this interview has been saved for review.")
+        # Stream the report once; later reruns (e.g. the button below) reuse the text.
+        if st.session_state.report is None:
+            st.session_state.report = st.write_stream(st.session_state.agent.stream_final_report(
+                list(st.session_state.messages)))
+        else:
+            st.markdown(st.session_state.report)
+        st.info("A detailed log of this interview has been saved for review.")
         
         if st.button("Start New Interview"):
             reset_interview()
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+import cache
+from cache import LLMCache
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    """Stubs the embedding call with a text -> vector table, recording the texts it is called for."""
+    table = {}
+    calls = []
+
+    def embed(self, text):
+        calls.append(text)
+        return table.get(text)
+
+    monkeypatch.setattr(LLMCache, "embed", embed)
+    return table, calls
+
+
+def test_shingles_are_word_trigrams():
+    assert LLMCache.shingles("Use TRIM on the names") == {"use trim on", "trim on the", "on the names"}
+
+
+def test_short_text_is_a_single_shingle():
+    assert LLMCache.shingles("Use TRIM") == {"use trim"}
+
+
+def test_empty_text_is_a_single_empty_shingle():
+    assert LLMCache.shingles("") == {""}
+
+
+def test_lookup_in_an_empty_namespace_skips_embedding(tmp_path, embeddings):
+    _, calls = embeddings
+    assert LLMCache(tmp_path).lookup("q1", "use trim on the names") == (None, None)
+    assert calls == []
+
+
+def test_bloom_miss_skips_embedding(tmp_path, embeddings):
+    table, calls = embeddings
+    table["use trim on the names"] = _unit(1, 0)
+    llm_cache = LLMCache(tmp_path)
+    llm_cache.store("q1", "use trim on the names", "stored")
+    calls.clear()
+    assert llm_cache.lookup("q1", "a pivot table by region") == (None, None)
+    assert calls == []
+
+
+def test_similar_text_above_the_threshold_is_a_hit(tmp_path, embeddings):
+    table, _ = embeddings
+    table["use trim on the names"] = _unit(1, 0)
+    table["use trim on the name column"] = _unit(1, 0.1)
+    llm_cache = LLMCache(tmp_path, threshold=0.9)
+    llm_cache.store("q1", "use trim on the names", "stored")
+    value, embedding = llm_cache.lookup("q1", "use trim on the name column")
+    assert value == "stored"
+    np.testing.assert_allclose(embedding, table["use trim on the name column"])
+
+
+def test_text_below_the_threshold_is_a_miss(tmp_path, embeddings):
+    table, _ = embeddings
+    table["use trim on the names"] = _unit(1, 0)
+    table["use trim on the dates"] = _unit(1, 1)
+    llm_cache = LLMCache(tmp_path, threshold=0.9)
+    llm_cache.store("q1", "use trim on the names", "stored")
+    value, embedding = llm_cache.lookup("q1", "use trim on the dates")
+    assert value is None
+    assert embedding is not None
+
+
+def test_namespaces_are_separate(tmp_path, embeddings):
+    table, _ = embeddings
+    table["use trim on the names"] = _unit(1, 0)
+    llm_cache = LLMCache(tmp_path)
+    llm_cache.store("q1", "use trim on the names", "stored")
+    assert llm_cache.lookup("q2", "use trim on the names") == (None, None)
+
+
+def test_entries_survive_a_new_instance(tmp_path, embeddings):
+    table, _ = embeddings
+    table["use trim on the names"] = _unit(1, 0)
+    LLMCache(tmp_path).store("q1", "use trim on the names", "first")
+    LLMCache(tmp_path).store("q1", "use trim on the names", "second")
+    matrix, values, _ = LLMCache(tmp_path)._index("q1")
+    assert values == ["first", "second"]
+    assert matrix.shape == (2, 2)
+
+
+def test_expired_entries_are_ignored(tmp_path, embeddings, monkeypatch):
+    table, _ = embeddings
+    table["use trim on the names"] = _unit(1, 0)
+    llm_cache = LLMCache(tmp_path, ttl=60)
+    llm_cache.store("q1", "use trim on the names", "stored")
+    now = cache.time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 61)
+    assert llm_cache.lookup("q1", "use trim on the names")[0] is None
+
+
+def test_exact_entries(tmp_path):
+    llm_cache = LLMCache(tmp_path)
+    key = LLMCache.make_key("model", "prompt")
+    assert llm_cache.get(key) is None
+    llm_cache.set(key, {"intent": "ANSWERING"})
+    assert LLMCache(tmp_path).get(key) == {"intent": "ANSWERING"}
+    assert LLMCache.make_key("model", "other prompt") != key
@@ -0,0 +1,43 @@
+import pytest
+
+import interviewer
+from interviewer import JobWinningInterviewAgent
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(interviewer, "api_key", "test-key")
+    agent = JobWinningInterviewAgent(candidate_name="Candidate")
+    agent.pending_questions = {"Data Analysis": "Which region sold the most?"}
+    return agent
+
+
+def _evaluation(score):
+    return {"score": score, "efficiency_score": score, "justification": "ok", "efficiency_justification": "ok"}
+
+
+def test_restore_undoes_a_turn(agent):
+    agent._record_technical_evaluation("Q1", "A1", "Data Cleaning", _evaluation(4))
+    before = agent.get_skill_profile()
+    checkpoint = agent.checkpoint()
+
+    agent.pending_questions.pop("Data Analysis")
+    agent._record_technical_evaluation("Q1", "A2", "Data Cleaning", _evaluation(1))
+    agent.skip_skill("Data Summarization")
+    agent.restore(checkpoint)
+
+    assert agent.get_skill_profile() == before
+    assert agent.pending_questions == {"Data Analysis": "Which region sold the most?"}
+
+
+def test_checkpoint_is_not_changed_by_later_turns(agent):
+    checkpoint = agent.checkpoint()
+    agent._record_technical_evaluation("Q1", "A1", "Data Cleaning", _evaluation(5))
+    agent.restore(checkpoint)
+    profile = agent.get_skill_profile()
+    assert profile["Data Cleaning"] == {"status": "Untested", "score": 0, "efficiency": 0, "evidence": ""}
+
+
+def test_skill_profile_is_a_copy(agent):
+    agent.get_skill_profile()["Data Cleaning"]["score"] = 5
+    assert agent.get_skill_profile()["Data Cleaning"]["score"] == 0
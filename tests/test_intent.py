@@ -0,0 +1,25 @@
+import pytest
+
+from intent import fast_intent
+
+
+@pytest.mark.parametrize("answer", ["hint", "Hint please!", "Can I get a hint?", "help"])
+def test_hint_requests(answer):
+    assert fast_intent(answer) == "HINT_REQUEST"
+
+
+@pytest.mark.parametrize("answer", ["idk", "I don't know.", "I don’t know", "No idea", "skip", "pass"])
+def test_give_ups(answer):
+    assert fast_intent(answer) == "UNCERTAIN"
+
+
+@pytest.mark.parametrize("answer", [
+    "Skip blank rows, then use TRIM",
+    "Use Remove Duplicates, skip blanks",
+    "Filter, then pass it to a PivotTable",
+    "Use a help column with =TRIM(A2)",
+    "I'd explain it with a pivot chart",
+    "I'm not sure, maybe XLOOKUP?",
+])
+def test_answers_are_left_to_the_model(answer):
+    assert fast_intent(answer) is None
@@ -0,0 +1,72 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake monotonic clock that `time.sleep` advances instead of blocking."""
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limiter.time, "sleep", sleep)
+    return now, sleeps
+
+
+def test_allows_a_burst_up_to_the_rate(clock):
+    _, sleeps = clock
+    limiter = RateLimiter(3, period=60.0)
+    for _ in range(3):
+        limiter.acquire()
+    assert sleeps == []
+
+
+def test_waits_for_the_next_token(clock):
+    _, sleeps = clock
+    limiter = RateLimiter(3, period=60.0)
+    for _ in range(4):
+        limiter.acquire()
+    assert sleeps == [pytest.approx(20.0)]
+
+
+def test_tokens_refill_over_time(clock):
+    now, sleeps = clock
+    limiter = RateLimiter(3, period=60.0)
+    for _ in range(3):
+        limiter.acquire()
+    now[0] += 40.0
+    limiter.acquire()
+    limiter.acquire()
+    assert sleeps == []
+
+
+def test_refill_is_capped_at_the_rate(clock):
+    now, sleeps = clock
+    limiter = RateLimiter(2, period=60.0)
+    now[0] += 600.0
+    for _ in range(3):
+        limiter.acquire()
+    assert sleeps == [pytest.approx(30.0)]
+
+
+def test_times_out_instead_of_waiting_past_the_deadline(clock):
+    _, sleeps = clock
+    limiter = RateLimiter(1, period=60.0)
+    limiter.acquire()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=10)
+    assert sleeps == []
+
+
+def test_waits_within_the_timeout(clock):
+    _, sleeps = clock
+    limiter = RateLimiter(1, period=60.0)
+    limiter.acquire()
+    limiter.acquire(timeout=60)
+    assert sleeps == [pytest.approx(60.0)]
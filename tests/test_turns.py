@@ -0,0 +1,25 @@
+from turns import once_per_turn
+
+
+def test_without_a_pending_turn_computes_every_time():
+    calls = []
+    assert once_per_turn(None, "result", lambda: calls.append(1) or "a") == "a"
+    assert once_per_turn(None, "result", lambda: calls.append(1) or "a") == "a"
+    assert len(calls) == 2
+
+
+def test_resumed_turn_returns_the_stored_result():
+    turn = {"prompt": "=TRIM(A2)"}
+    assert once_per_turn(turn, "result", lambda: ("ANSWERING", "Nice.")) == ("ANSWERING", "Nice.")
+
+    def recompute():
+        raise AssertionError("a resumed turn must not repeat the call")
+
+    assert once_per_turn(turn, "result", recompute) == ("ANSWERING", "Nice.")
+
+
+def test_keys_are_independent():
+    turn = {}
+    once_per_turn(turn, "result", lambda: "first")
+    assert once_per_turn(turn, "next_question", lambda: "second") == "second"
+    assert turn == {"result": "first", "next_question": "second"}
@@ -0,0 +1,11 @@
+def once_per_turn(turn, key, compute):
+    """
+    Returns what `compute()` gave for `key` in the pending `turn`, calling it only the first
+    time, so a resumed turn reuses the result (and agent updates) of its interrupted run.
+    With no pending turn, `compute()` is simply called.
+    """
+    if turn is None:
+        return compute()
+    if key not in turn:
+        turn[key] = compute()
+    return turn[key]